@@ -6,30 +6,67 @@ st.set_page_config(
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import numpy as np
+import time
+import io
+from season_cache import get_season_cache
+
+# Seconds to wait on any single request to the league site or GitHub
+request_timeout = 10
 
 # Function to determine the most recent year
 def get_most_recent_year():
     url_index = "https://therzb.com/RZB/leaguehtml/index.html"
-    response = requests.get(url_index)
+    response = requests.get(url_index, timeout=request_timeout)
     response.raise_for_status()
     soup = BeautifulSoup(response.text, 'html.parser')
 
     recent_year = max(int(link.text.strip()) for link in soup.find_all("a") if link.text.strip().isdigit())
     return recent_year
 
+# One cache per server process, shared by every browser session and page
+season_cache = get_season_cache()
+
+# Seconds to reuse the most recent year and data version probes before asking the servers again
+probe_ttl = 300
+
+# Function to determine the data version of a page from its validators, shared across sessions
+def get_data_version(url):
+    # Fall back to a 15 minute window if the server sends no validators or the probe fails
+    def probe():
+        try:
+            response = requests.head(url, timeout=5, allow_redirects=True)
+            if response.ok:
+                version = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                if version:
+                    return version
+        except requests.RequestException:
+            pass
+        return f"t{int(time.time() // 900)}"
+
+    return season_cache.get_or_load(("data_version", url), probe, ttl=probe_ttl)
+
+# Function to determine the data version of a season's pages
+def get_season_version(year, most_recent_year):
+    # Completed seasons never change
+    if year < most_recent_year:
+        return "final"
+    # The current season changes as games are played
+    return get_data_version(f"https://therzb.com/RZB/leaguehtml/{year}standings.html")
+
 def scrape_year(year):
     # URL for the stats and standings page of a specific year
     url_stats = f"https://therzb.com/RZB/leaguehtml/{year}teamstats.html"
     url_standings = f"https://therzb.com/RZB/leaguehtml/{year}standings.html"
 
     # Get stats page content
-    response_stats = requests.get(url_stats)
+    response_stats = requests.get(url_stats, timeout=request_timeout)
     response_stats.raise_for_status()
     html_content_stats = response_stats.text
     soup_stats = BeautifulSoup(html_content_stats, 'html.parser')
 
     # Get standings page content
-    response_standings = requests.get(url_standings)
+    response_standings = requests.get(url_standings, timeout=request_timeout)
     response_standings.raise_for_status()
     html_content_standings = response_standings.text
     soup_standings = BeautifulSoup(html_content_standings, 'html.parser')
@@ -153,16 +190,35 @@ def predict_wins_all_metrics(smoothed_avg, team_data):
     return predictions
 
 # Function to color text in the "Avg Wins" column based on the value ranges
-def color_wins_column(val):
-    if 1 <= val <= 4:
-        return "color: #ff4d4d;"  # Red
-    elif 5 <= val <= 8:
-        return "color: #ffcc00;"  # Amber
-    elif 9 <= val <= 12:
-        return "color: #b3ffb3;"  # Light Green
-    elif 13 <= val <= 16:
-        return "color: #33cc33;"  # Dark Green
-    return ""
+# Works on the whole column at once (Styler.apply, axis=0) rather than once per cell
+def color_wins_column(avg_wins):
+    conditions = [
+        avg_wins.between(1, 4),
+        avg_wins.between(5, 8),
+        avg_wins.between(9, 12),
+        avg_wins.between(13, 16),
+    ]
+    colours = [
+        "color: #ff4d4d;",  # Red
+        "color: #ffcc00;",  # Amber
+        "color: #b3ffb3;",  # Light Green
+        "color: #33cc33;",  # Dark Green
+    ]
+    return np.select(conditions, colours, default="")
+
+# Number of rows sent to the browser per page for large tables
+page_size = 100
+
+# Display a dataframe with numeric dtypes intact so Streamlit serialises real Arrow columns
+def display_dataframe(df):
+    st.dataframe(df.infer_objects())
+
+# Display one page of a large dataframe at a time so only that slice is indexed and serialised
+def display_paginated_dataframe(df, index_column, key):
+    page_count = max(1, -(-len(df) // page_size))
+    page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1, key=key)
+    start = (page - 1) * page_size
+    display_dataframe(df.iloc[start:start + page_size].set_index(index_column))
 
 # function to fill the value of Unit column based on the value of Metric column
 def fill_unit_column(row):
@@ -181,10 +237,17 @@ def fill_unit_column(row):
          
 # load in smoothed averages dataframe
 smoothed_url = "https://raw.githubusercontent.com/fofota/fof_html_scraper/main/smoothed_avg.csv"
-smoothed_avg = pd.read_csv(smoothed_url)
-if 'wins.1' in smoothed_avg.columns:
-    smoothed_avg = smoothed_avg.drop(columns=['wins.1'])
-smoothed_avg.reset_index(drop=True, inplace=True)
+
+def load_smoothed_avg():
+    response = requests.get(smoothed_url, timeout=request_timeout)
+    response.raise_for_status()
+    smoothed_avg = pd.read_csv(io.StringIO(response.text))
+    if 'wins.1' in smoothed_avg.columns:
+        smoothed_avg = smoothed_avg.drop(columns=['wins.1'])
+    smoothed_avg.reset_index(drop=True, inplace=True)
+    return smoothed_avg
+
+smoothed_avg = season_cache.get_or_load(("smoothed_avg", get_data_version(smoothed_url)), load_smoothed_avg)
 
 metric_importance_dict = {
     'pythag_wins': 5,
@@ -299,11 +362,18 @@ rounding_rules = {
 
 # load in raw_data dataframe
 raw_data_url = "https://raw.githubusercontent.com/fofota/fof_html_scraper/main/filtered_stats_2045_2063.csv"
-raw_data = pd.read_csv(raw_data_url)
-raw_data.reset_index(drop=True, inplace=True)
-raw_data = raw_data[raw_data['team'] != 'League'] # remove league averages
-raw_data = raw_data[columns_to_include]
-raw_data['year'] = raw_data['year'].astype(str)
+
+def load_raw_data():
+    response = requests.get(raw_data_url, timeout=request_timeout)
+    response.raise_for_status()
+    raw_data = pd.read_csv(io.StringIO(response.text))
+    raw_data.reset_index(drop=True, inplace=True)
+    raw_data = raw_data[raw_data['team'] != 'League'] # remove league averages
+    raw_data = raw_data[columns_to_include]
+    raw_data['year'] = raw_data['year'].astype(str)
+    return raw_data
+
+raw_data = season_cache.get_or_load(("raw_data", get_data_version(raw_data_url)), load_raw_data)
             
 
 # Streamlit App
@@ -326,11 +396,19 @@ with st.expander("Use the sidebar to select a team to evaluate. Select here for
         ''')
 
 # Get the most recent year
-most_recent_year = get_most_recent_year()
+most_recent_year = season_cache.get_or_load(("most_recent_year",), get_most_recent_year, ttl=probe_ttl)
 
 # Select year in sidebar
 selected_year = st.sidebar.selectbox("Select season", range(most_recent_year, 2044, -1))
-data = scrape_year(selected_year)
+data_version = get_season_version(selected_year, most_recent_year)
+data = season_cache.get_or_load((selected_year, data_version), lambda: scrape_year(selected_year))
+
+# Show shared cache metrics
+cache_stats = season_cache.stats()
+st.sidebar.caption(
+    f"Shared data cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['coalesced']} coalesced, "
+    f"{cache_stats['evictions']} evictions, {cache_stats['bytes'] / 2**20:.1f} of {cache_stats['max_bytes'] / 2**20:.0f} MB"
+)
 
 # process the scraped data for that year and add additional columns
 filtered_data = data[list(columns_to_keep.keys())]
@@ -357,8 +435,11 @@ team_list = filtered_data["team"].unique()
 default_team = "New York (A) Jets" if "New York (A) Jets" in team_list else team_list[0]
 selected_team = st.sidebar.selectbox("Select team", team_list, index=team_list.tolist().index(default_team))
 
-# When analyse team button is clicked
+# When analyse team button is clicked, remember the selection so the results (and table pagers) survive reruns
 if st.sidebar.button("Analyze Team"):
+    st.session_state["analyzed_selection"] = (selected_year, selected_team)
+
+if st.session_state.get("analyzed_selection") == (selected_year, selected_team):
     with st.spinner("Collecting and Analysing team data..."):
                 
         # Filter data for the selected team and display
@@ -382,10 +463,10 @@ if st.sidebar.button("Analyze Team"):
             # Convert predictions to a DataFrame
             predictions_df = pd.DataFrame.from_dict(predictions, orient="index", columns=["Avg Wins"])
 
-            # Add the corresponding metric values from team_data as strings
+            # Add the corresponding metric values from team_data, kept numeric
             predictions_df["Value"] = predictions_df.index.map(
-                lambda metric: str(team_data[metric].values[0]) if metric in team_data.columns else None
-            )
+                lambda metric: team_data[metric].values[0] if metric in team_data.columns else None
+            ).astype(float)
                         
             # Reset the index to make "Metric" a column and rename columns
             predictions_df.reset_index(inplace=True)
@@ -401,9 +482,10 @@ if st.sidebar.button("Analyze Team"):
 
             # Set index and use index to apply text colouring
             predictions_df = predictions_df.set_index("Metric")
-            styled_predictions_df = predictions_df.style.applymap(
-                color_wins_column, subset=["Avg Wins"]
-            )
+            # Format numbers for display only; the underlying columns stay numeric
+            styled_predictions_df = predictions_df.style.apply(
+                color_wins_column, subset=["Avg Wins"], axis=0
+            ).format({"Value": "{:g}", "Avg Wins": "{:g}", "Metric Importance": "{:.0f}"}, na_rep="")
             
             # Display the benchmarked metrics dataframe
             st.dataframe(styled_predictions_df)
@@ -411,14 +493,14 @@ if st.sidebar.button("Analyze Team"):
             # Display team metrics
             st.write(f"Metrics for the selected team: {selected_year} {selected_team}")
             team_data['year'] = team_data['year'].astype(str)
-            st.dataframe(team_data.set_index("team"))
+            display_dataframe(team_data.set_index("team"))
         else:
             st.error("Team data is not available.")
             
         st.write(f"All {most_recent_year} team-by-team data")
         filtered_data['year'] = filtered_data['year'].astype(str)
-        st.dataframe(filtered_data.set_index(filtered_data.columns[0]))
+        display_dataframe(filtered_data.set_index(filtered_data.columns[0]))
         st.write("Historic (2045-64) RZB averages for each metric, by team regular season win record")
-        st.dataframe(smoothed_avg.set_index(smoothed_avg.columns[0]))
+        display_dataframe(smoothed_avg.set_index(smoothed_avg.columns[0]))
         st.write("All 2045-64 RZB teams for each metric")
-        st.dataframe(raw_data.set_index(raw_data.columns[0]))    
\ No newline at end of file
+        display_paginated_dataframe(raw_data, raw_data.columns[0], key="raw_data_page")
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Shared memory budget for parsed seasons and benchmark frames across all sessions
+cache_max_bytes = 256 * 1024 * 1024
+
+# Seconds a session waits on another session's in-flight load before giving up
+cache_wait_timeout = 120
+
+
+# Estimate the memory held by a cached value (DataFrames are measured deeply)
+def value_nbytes(value):
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    return 0
+
+
+class SeasonCache:
+    """
+    Process-wide LRU cache of parsed season frames and benchmark artifacts.
+
+    Entries are keyed by (name, data version), evicted least-recently-used first
+    once the total size passes max_bytes, and concurrent loads of the same key
+    share a single call to the loader. Cached values are shared between sessions
+    and must be treated as read-only.
+
+    Metrics: hits are served from the cache, misses call the loader, coalesced
+    calls waited on another caller's in-flight load, and evictions were dropped
+    to stay under max_bytes. Zero-size entries (such as TTL'd version probes)
+    free no memory, so they are never evicted for space and only expire.
+    """
+
+    def __init__(self, max_bytes, wait_timeout=None):
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes, expires_at)
+        self._in_flight = {}  # key -> Future shared by waiting callers
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Returns the cached value for key, calling loader() to build it on a miss.
+
+        If another thread is already loading the same key, waits for its result
+        (up to wait_timeout seconds, then raises TimeoutError) instead of loading
+        again. Loader exceptions are raised to every waiter and nothing is cached.
+        With ttl (seconds) the entry is reloaded once it is older than ttl.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, nbytes, expires_at = entry
+                if expires_at is None or time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.current_bytes -= nbytes
+            waiting_on = self._in_flight.get(key)
+            if waiting_on is None:
+                self.misses += 1
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+        if waiting_on is not None:
+            return waiting_on.result(timeout=self.wait_timeout)
+
+        try:
+            value = loader()
+            nbytes = value_nbytes(value)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            del self._in_flight[key]
+            self._store(key, value, nbytes, expires_at)
+        future.set_result(value)
+        return value
+
+    def _store(self, key, value, nbytes, expires_at):
+        if nbytes > self.max_bytes:
+            return  # too large to ever fit; hand it back uncached
+        self._entries[key] = (value, nbytes, expires_at)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            # Oldest entry that actually frees memory
+            evicted_key = next(k for k, (_, n, _) in self._entries.items() if n > 0)
+            _, evicted_bytes, _ = self._entries.pop(evicted_key)
+            self.current_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def stats(self):
+        """Returns a snapshot of the hit/miss/coalesced/eviction counters and memory use."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_season_cache = None
+_season_cache_lock = threading.Lock()
+
+# One cache per server process, shared by every browser session and by every
+# module that runs the main script (as __main__ or as Team_Stats_Benchmarking)
+def get_season_cache():
+    global _season_cache
+    with _season_cache_lock:
+        if _season_cache is None:
+            _season_cache = SeasonCache(max_bytes=cache_max_bytes, wait_timeout=cache_wait_timeout)
+        return _season_cache
@@ -0,0 +1,167 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from season_cache import SeasonCache, value_nbytes
+
+
+def make_frame(rows=100):
+    return pd.DataFrame({"x": np.zeros(rows, dtype=np.int64)})
+
+
+FRAME_BYTES = value_nbytes(make_frame())
+
+
+def wait_for_coalesced(cache, count, timeout=5):
+    deadline = time.monotonic() + timeout
+    while cache.stats()["coalesced"] < count:
+        if time.monotonic() > deadline:
+            pytest.fail(f"expected {count} coalesced waiters, got {cache.stats()['coalesced']}")
+        time.sleep(0.01)
+
+
+def test_hit_after_miss_returns_same_object():
+    cache = SeasonCache(max_bytes=10 * FRAME_BYTES)
+    frame = make_frame()
+    assert cache.get_or_load((2064, "final"), lambda: frame) is frame
+    assert cache.get_or_load((2064, "final"), make_frame) is frame
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, FRAME_BYTES)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    cache = SeasonCache(max_bytes=2 * FRAME_BYTES)
+    cache.get_or_load((2062, "final"), make_frame)
+    cache.get_or_load((2063, "final"), make_frame)
+    cache.get_or_load((2062, "final"), make_frame)  # 2063 is now least recently used
+    cache.get_or_load((2064, "final"), make_frame)
+
+    assert list(cache._entries) == [(2062, "final"), (2064, "final")]
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 2 * FRAME_BYTES
+
+
+def test_oversized_value_is_returned_but_not_cached():
+    cache = SeasonCache(max_bytes=FRAME_BYTES)
+    cache.get_or_load((2063, "final"), make_frame)
+    big = make_frame(rows=1000)
+    assert cache.get_or_load((2064, "final"), lambda: big) is big
+
+    assert list(cache._entries) == [(2063, "final")]
+    assert cache.stats()["evictions"] == 0
+
+
+def test_concurrent_loads_share_one_loader_call():
+    cache = SeasonCache(max_bytes=10 * FRAME_BYTES)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return make_frame()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load((2064, "v1"), loader)))
+        for _ in range(8)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    wait_for_coalesced(cache, 7)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert not any(thread.is_alive() for thread in threads)
+
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(result is results[0] for result in results)
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 7, 0)
+
+
+def test_loader_exception_reaches_waiters_and_is_not_cached():
+    cache = SeasonCache(max_bytes=10 * FRAME_BYTES)
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing_loader():
+        started.set()
+        release.wait(5)
+        raise ValueError("scrape failed")
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load((2064, "v1"), failing_loader)
+        except ValueError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=call)
+    first.start()
+    started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    wait_for_coalesced(cache, 1)
+    release.set()
+    first.join(5)
+    waiter.join(5)
+    assert not first.is_alive() and not waiter.is_alive()
+
+    assert len(errors) == 2
+    assert cache.stats()["entries"] == 0
+    assert cache._in_flight == {}
+    frame = make_frame()
+    assert cache.get_or_load((2064, "v1"), lambda: frame) is frame
+
+
+def test_expired_entry_is_reloaded():
+    cache = SeasonCache(max_bytes=10 * FRAME_BYTES)
+    assert cache.get_or_load(("most_recent_year",), lambda: 2064, ttl=0.05) == 2064
+    assert cache.get_or_load(("most_recent_year",), lambda: 2065, ttl=0.05) == 2064
+    time.sleep(0.1)
+    assert cache.get_or_load(("most_recent_year",), lambda: 2065, ttl=0.05) == 2065
+    assert cache.stats()["misses"] == 2
+
+
+def test_zero_size_entries_are_not_evicted_for_space():
+    cache = SeasonCache(max_bytes=2 * FRAME_BYTES)
+    cache.get_or_load(("most_recent_year",), lambda: 2064, ttl=300)
+    cache.get_or_load((2062, "final"), make_frame)
+    cache.get_or_load((2063, "final"), make_frame)
+    cache.get_or_load((2064, "final"), make_frame)
+
+    assert list(cache._entries) == [("most_recent_year",), (2063, "final"), (2064, "final")]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_waiter_gives_up_after_wait_timeout():
+    cache = SeasonCache(max_bytes=10 * FRAME_BYTES, wait_timeout=0.05)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return make_frame()
+
+    loader_thread = threading.Thread(target=cache.get_or_load, args=((2064, "v1"), slow_loader))
+    loader_thread.start()
+    started.wait(5)
+    with pytest.raises(TimeoutError):
+        cache.get_or_load((2064, "v1"), slow_loader)
+    release.set()
+    loader_thread.join(5)
+    assert not loader_thread.is_alive()
+    assert cache.stats()["entries"] == 1